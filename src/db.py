@@ -12,7 +12,7 @@ from __future__ import annotations
 
 import json
 import sqlite3
-from hashlib import sha1
+from hashlib import blake2b, sha1
 from typing import Any, Dict, Iterable, List, Optional
 
 
@@ -80,56 +80,114 @@ COMMIT;
     conn.commit()
 
 
+def _canonical_key_for_item(item: Dict[str, Any]) -> str:
+    """Return the normalized identity string hashed by the canonical hash.
+
+    Uses the pre-normalized ``name_norm`` / ``description_norm`` fields from
+    the parser when present and normalizes `name` / `description` otherwise.
+
+    Args:
+        item: dictionary with at least `name`, optional `description` and `tags`.
+
+    Returns:
+        ``name|description|tags`` with lowercased name/description and
+        sorted tags.
+    """
+    name = item.get("name_norm")
+    if name is None:
+        name = (item.get("name") or "").strip().lower()
+    description = item.get("description_norm")
+    if description is None:
+        description = (item.get("description") or "").strip().lower()
+    tags = sorted(item.get("tags") or [])
+    return f"{name}|{description}|{','.join(tags)}"
+
+
 def _canonical_hash_for_item(item: Dict[str, Any]) -> str:
     """Return a stable canonical hash for a dish item.
 
     The canonical hash is derived from the dish name, description and
     sorted tag list. It is used as a stable identifier to deduplicate
-    dishes across snapshots. The function returns a hex SHA1 digest.
+    dishes across snapshots. The function returns a 128 bit BLAKE2b hex
+    digest (this is an identity hash, no cryptographic strength needed).
 
     Args:
         item: dictionary with at least `name`, optional `description` and `tags`.
 
     Returns:
-        hex string of the SHA1 digest.
+        hex string of the BLAKE2b digest (32 chars).
     """
-    name = (item.get("name") or "").strip().lower()
-    description = (item.get("description") or "").strip().lower()
-    tags = sorted(item.get("tags") or [])
-    key = f"{name}|{description}|{','.join(tags)}"
+    key = _canonical_key_for_item(item)
+    return blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _legacy_hash_for_item(item: Dict[str, Any]) -> str:
+    """Return the SHA1 canonical hash used by databases before BLAKE2b.
+
+    Args:
+        item: dictionary with at least `name`, optional `description` and `tags`.
+
+    Returns:
+        hex string of the SHA1 digest (40 chars).
+    """
+    key = _canonical_key_for_item(item)
     return sha1(key.encode("utf-8")).hexdigest()
 
 
-def _upsert_dish(conn: sqlite3.Connection, item: Dict[str, Any]) -> int:
+def _has_legacy_hashes(conn: sqlite3.Connection) -> bool:
+    """Return True if any `dish` row still uses a SHA1 canonical hash."""
+    cur = conn.execute(
+        "SELECT EXISTS (SELECT 1 FROM dish WHERE length(canonical_hash) = 40)"
+    )
+    return bool(cur.fetchone()[0])
+
+
+def _upsert_dish(
+    conn: sqlite3.Connection, item: Dict[str, Any], migrate_legacy: bool = False
+) -> int:
     """Insert or update a `dish` row and return its id.
 
     Uses the canonical hash to detect existing dishes. If the dish already
-    exists the `name` and `description` fields are updated.
+    exists the `name` and `description` fields are updated. This is a single
+    upsert statement (requires SQLite >= 3.35 for ``RETURNING``).
 
     Args:
         conn: sqlite3.Connection
         item: parsed dish dictionary (expects `name` and `description` keys)
+        migrate_legacy: if True, a row still keyed by the legacy SHA1 hash
+            is re-keyed to the BLAKE2b hash and reused instead of inserting
+            a duplicate dish. If a BLAKE2b row for the dish already exists,
+            that row is used and the legacy row is left as it is.
 
     Returns:
         integer primary key of the dish row.
     """
     ch = _canonical_hash_for_item(item)
     cur = conn.cursor()
-    cur.execute("SELECT id FROM dish WHERE canonical_hash = ?", (ch,))
-    row = cur.fetchone()
-    if row:
-        dish_id = row[0]
-        # Optionally update name/description/category if changed
+    if migrate_legacy:
+        # OR IGNORE: when the BLAKE2b row already exists the re-key would
+        # violate the UNIQUE constraint; fall through to the upsert instead
         cur.execute(
-            "UPDATE dish SET name = ?, description = ? WHERE id = ?",
-            (item.get("name"), item.get("description"), dish_id),
+            "UPDATE OR IGNORE dish SET canonical_hash = ?, name = ?, description = ? "
+            "WHERE canonical_hash = ? RETURNING id",
+            (
+                ch,
+                item.get("name"),
+                item.get("description"),
+                _legacy_hash_for_item(item),
+            ),
         )
-        return dish_id
+        row = cur.fetchone()
+        if row:
+            return row[0]
     cur.execute(
-        "INSERT INTO dish (canonical_hash, name, description) VALUES (?, ?, ?)",
+        "INSERT INTO dish (canonical_hash, name, description) VALUES (?, ?, ?) "
+        "ON CONFLICT(canonical_hash) DO UPDATE SET "
+        "name = excluded.name, description = excluded.description "
+        "RETURNING id",
         (ch, item.get("name"), item.get("description")),
     )
-    return cur.lastrowid
+    return cur.fetchone()[0]
 
 
 def _upsert_tags(conn: sqlite3.Connection, tags: Dict[str, str]) -> Dict[str, int]:
@@ -148,7 +206,6 @@ def _upsert_tags(conn: sqlite3.Connection, tags: Dict[str, str]) -> Dict[str, in
         cur.execute(
             "INSERT OR IGNORE INTO tag (code, name) VALUES (?, ?)", (code, name)
         )
-    conn.commit()
     for code in tags.keys():
         cur.execute("SELECT id FROM tag WHERE code = ?", (code,))
         row = cur.fetchone()
@@ -162,7 +219,8 @@ def _ensure_tags(conn: sqlite3.Connection, codes: Iterable[str]) -> Dict[str, in
 
     Unlike `_upsert_tags` this accepts an iterable of codes (possibly
     without human-readable names) and inserts placeholder rows when
-    necessary.
+    necessary. All codes are written with one ``executemany`` and resolved
+    with a single ``SELECT ... IN (...)``.
 
     Args:
         conn: sqlite3.Connection
@@ -171,23 +229,19 @@ def _ensure_tags(conn: sqlite3.Connection, codes: Iterable[str]) -> Dict[str, in
     Returns:
         mapping of tag code -> tag id
     """
+    unique_codes = [code for code in dict.fromkeys(codes) if code]
+    if not unique_codes:
+        return {}
     cur = conn.cursor()
-    code_to_id: Dict[str, int] = {}
-    for code in codes:
-        if not code:
-            continue
-        cur.execute(
-            "INSERT OR IGNORE INTO tag (code, name) VALUES (?, ?)", (code, None)
-        )
-    conn.commit()
-    for code in codes:
-        if not code:
-            continue
-        cur.execute("SELECT id FROM tag WHERE code = ?", (code,))
-        row = cur.fetchone()
-        if row:
-            code_to_id[code] = row[0]
-    return code_to_id
+    cur.executemany(
+        "INSERT OR IGNORE INTO tag (code, name) VALUES (?, NULL)",
+        [(code,) for code in unique_codes],
+    )
+    placeholders = ",".join("?" * len(unique_codes))
+    cur.execute(
+        f"SELECT id, code FROM tag WHERE code IN ({placeholders})", unique_codes
+    )
+    return {code: tag_id for tag_id, code in cur.fetchall()}
 
 
 def store_snapshot(
@@ -205,7 +259,7 @@ def store_snapshot(
     per-snapshot entries into `snapshot_entry` including `category` and
     `price_eur`.
 
-    The function runs the per-item writes in a transaction to keep the
+    All writes run in one transaction (``BEGIN IMMEDIATE``) to keep the
     snapshot consistent.
 
     Args:
@@ -220,41 +274,57 @@ def store_snapshot(
         snapshot_id (int)
     """
 
-    _upsert_tags(conn, tags)
-
     cur = conn.cursor()
-    # create snapshot row if not exists
-    cur.execute(
-        "INSERT OR IGNORE INTO snapshot (date, attempt) VALUES (?, ?)",
-        (date_token, attempt),
-    )
-    cur.execute(
-        "SELECT id FROM snapshot WHERE date = ? AND attempt = ?", (date_token, attempt)
-    )
-    snapshot_id = cur.fetchone()[0]
-    conn.commit()
-
-    # We'll batch insert entries in a transaction
+    # Tags, the snapshot row, dishes and entries are written in a single
+    # transaction: the snapshot is either stored completely or not at all.
     try:
-        conn.execute("BEGIN")
+        if not conn.in_transaction:
+            cur.execute("BEGIN IMMEDIATE")
+        _upsert_tags(conn, tags)
+
+        # create snapshot row if not exists
+        cur.execute(
+            "INSERT OR IGNORE INTO snapshot (date, attempt) VALUES (?, ?)",
+            (date_token, attempt),
+        )
+        cur.execute(
+            "SELECT id FROM snapshot WHERE date = ? AND attempt = ?",
+            (date_token, attempt),
+        )
+        snapshot_id = cur.fetchone()[0]
+        # resolve every tag code used by this snapshot up front
+        tag_map = _ensure_tags(
+            conn, (code for it in items for code in (it.get("zusatzstoffe") or []))
+        )
+
+        # databases created before the switch to BLAKE2b are migrated
+        # lazily, one dish at a time as it shows up again
+        migrate_legacy = _has_legacy_hashes(conn)
+        dish_tag_rows = []
+        entry_rows = []
         for it in items:
-            dish_id = _upsert_dish(conn, it)
+            dish_id = _upsert_dish(conn, it, migrate_legacy)
             # ensure tags and dish_tag mapping
-            tags = (
-                it.get("zusatzstoffe") or []
-            )  # German for "additives", also includes tags
-            tag_map = _ensure_tags(conn, tags)
-            for code, tag_id in tag_map.items():
-                cur.execute(
-                    "INSERT OR IGNORE INTO dish_tag (dish_id, tag_id) VALUES (?, ?)",
-                    (dish_id, tag_id),
-                )
+            # German for "additives", also includes tags
+            item_codes = it.get("zusatzstoffe") or []
+            # plain lookups in the batch-resolved map; duplicate pairs are
+            # dropped by INSERT OR IGNORE
+            for code in item_codes:
+                tag_id = tag_map.get(code)
+                if tag_id:
+                    dish_tag_rows.append((dish_id, tag_id))
             category = it.get("category")
             price = it.get("price_eur")
-            cur.execute(
-                "INSERT OR REPLACE INTO snapshot_entry (snapshot_id, dish_id, category, price_eur) VALUES (?, ?, ?, ?)",
-                (snapshot_id, dish_id, category, price),
-            )
+            entry_rows.append((snapshot_id, dish_id, category, price))
+
+        cur.executemany(
+            "INSERT OR IGNORE INTO dish_tag (dish_id, tag_id) VALUES (?, ?)",
+            dish_tag_rows,
+        )
+        cur.executemany(
+            "INSERT OR REPLACE INTO snapshot_entry (snapshot_id, dish_id, category, price_eur) VALUES (?, ?, ?, ?)",
+            entry_rows,
+        )
         conn.commit()
     except Exception:
         conn.rollback()
@@ -284,32 +354,38 @@ def compute_empties(conn: sqlite3.Connection, date_token: str) -> List[Dict[str,
 SELECT d.id, d.name, d.canonical_hash
 FROM snapshot_entry s1
 JOIN dish d ON d.id = s1.dish_id
+LEFT JOIN snapshot_entry s2 ON s2.snapshot_id = ? AND s2.dish_id = s1.dish_id
 WHERE s1.snapshot_id = ?
-  AND NOT EXISTS (
-    SELECT 1 FROM snapshot_entry s2 WHERE s2.snapshot_id = ? AND s2.dish_id = s1.dish_id
-  )
+  AND s2.dish_id IS NULL
 """,
-        (sn1, sn2),
+        (sn2, sn1),
     )
     rows = cur.fetchall()
     empties: List[Dict[str, Any]] = []
-    dish_ids = []
     for r in rows:
         dish_id, name, ch = r
         empties.append({"dish_id": dish_id, "name": name, "canonical_hash": ch})
-        dish_ids.append(dish_id)
 
     # mark went_empty = 1 on the snapshot_entry rows for attempt=1
-    if dish_ids:
-        q = f"UPDATE snapshot_entry SET went_empty = 1 WHERE snapshot_id = ? AND dish_id IN ({','.join(['?']*len(dish_ids))})"
-        cur.execute(q, (sn1, *dish_ids))
+    cur.execute(
+        """
+UPDATE snapshot_entry SET went_empty = 1
+WHERE snapshot_id = ?1
+  AND NOT EXISTS (
+    SELECT 1 FROM snapshot_entry s2
+    WHERE s2.snapshot_id = ?2 AND s2.dish_id = snapshot_entry.dish_id
+  )
+""",
+        (sn1, sn2),
+    )
+    empties_count = cur.rowcount
 
     # update snapshot metadata for attempt=2 with count and timestamp
     import datetime as _dt
 
     cur.execute(
         "UPDATE snapshot SET empties_count = ?, computed_at = ? WHERE id = ?",
-        (len(dish_ids), _dt.datetime.utcnow().isoformat() + "Z", sn2),
+        (empties_count, _dt.datetime.utcnow().isoformat() + "Z", sn2),
     )
     conn.commit()
     return empties
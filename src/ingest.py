@@ -119,9 +119,13 @@ def main() -> None:
 
         # recommended pragmas for cron usage
         conn.execute("PRAGMA foreign_keys = ON")
-        conn.execute("PRAGMA journal_mode = WAL")
+        # WAL mode is persistent in the database file; only switch once
+        if conn.execute("PRAGMA journal_mode").fetchone()[0] != "wal":
+            conn.execute("PRAGMA journal_mode = WAL")
         conn.execute("PRAGMA synchronous = NORMAL")
         conn.execute("PRAGMA busy_timeout = 5000")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        conn.execute("PRAGMA mmap_size = 67108864")
 
         dbmod.init_db(conn)
 
@@ -152,10 +156,13 @@ def main() -> None:
         # duplicate tracebacks and ensure cleanup runs below
         sys.exit(1)
     finally:
-        # only commit/close if connection was created
+        # only close if connection was created; store_snapshot and
+        # compute_empties commit their own writes
         if conn is not None:
             try:
-                conn.commit()
+                # refresh planner statistics for the tables this run queried,
+                # if they need it; SQLite's recipe for short-lived connections
+                conn.execute("PRAGMA optimize")
             except Exception:
                 pass
             try:
@@ -15,29 +15,97 @@ The parser is heuristic to handle compressed single-line HTML.
 from __future__ import annotations
 
 import datetime
+import functools
 import json
 import re
-from typing import Any, Optional, List, Dict
+from typing import AbstractSet, Any, Optional, List, Dict, Set, Tuple
 import logging
 
 import requests
-from bs4 import BeautifulSoup, Tag
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup, NavigableString, SoupStrainer, Tag
 import html as _html
 
+try:
+    from lxml import etree, html as lxml_html
+except ImportError:  # optional, fall back to BeautifulSoup
+    lxml_html = None
+
+# lxml parser for pages that must be handed over as UTF-8 bytes (see
+# _parse_html_cached); everything else is parsed from the str directly
+_LXML_PARSER = lxml_html.HTMLParser(encoding="utf-8") if lxml_html else None
+# the text nodes _walk_node collects: comments are not text() nodes and
+# script/style/template/ruby-annotation contents are left out
+_LXML_TEXT = (
+    etree.XPath(
+        ".//text()[not(parent::script or parent::style or parent::template"
+        " or parent::rt or parent::rp)]",
+        smart_strings=False,
+    )
+    if lxml_html
+    else None
+)
+
 
 PRICE_RE = re.compile(r"(\d+[\.,]\d{2})\s*€")
 # capture alphanumeric codes or numeric codes, comma/space separated, e.g. (1,19) or (WEI)
 ZUSATZ_RE = re.compile(r"\(?\s*([A-Za-z0-9]{1,5}(?:[,\s]*[A-Za-z0-9]{1,5})*)\s*\)?")
 
+# inline JS mapping: zusatzstoffe["KEY"] = JSON.parse('...')
+_ZUSATZ_JS_RE = re.compile(
+    r"zusatzstoffe\[\"([^\"]+)\"\]\s*=\s*JSON\.parse\((?P<j>\"[^\"]*\"|'[^']*')\)"
+)
+_TAG_DIV_RE = re.compile(r"_tag_(\d+)")
+# "name" member of a zusatzstoff JSON payload (a JSON string, escapes allowed)
+_ZUSATZ_NAME_RE = re.compile(r'"name"\s*:\s*"((?:[^"\\]|\\.)*)"')
+_REF_QUOTED_RE = re.compile(r'"([^\"]+)"')
+_WORD_RE = re.compile(r"[A-Za-z0-9]+")
+_WS_RE = re.compile(r"\s+")
+
+# shared HTTP session: reuses pooled connections across fetches
+_SESSION = requests.Session()
+_SESSION.headers.update(
+    {
+        "User-Agent": "MensaFetcher/0.1 (+https://github.com/LeanderJDev) py-requests/"
+        + requests.__version__
+    }
+)
+_SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
+# Characters to clean from parsed text: non-breaking space becomes a regular
+# space; soft hyphen (U+00AD) and several zero-widths are dropped
+_TRANS = str.maketrans(
+    {
+        "\u00a0": " ",  # non-breaking space
+        "\u00ad": None,  # soft hyphen
+        "\u200b": None,  # zero width space
+        "\ufeff": None,  # byte order mark
+        "\u200e": None,  # left-to-right mark
+        "\u200f": None,  # right-to-left mark
+    }
+)
+
+
+class _MenuStrainer(SoupStrainer):
+    """SoupStrainer that only builds dish ``<li>`` and day ``<div>`` subtrees.
+
+    Everything outside ``li[data-gid][ref]`` and ``div[id*="_tag_"]``
+    (navigation, scripts, footers, ...) is skipped during tree construction.
+    """
+
+    def allow_tag_creation(
+        self, nsprefix: Optional[str], name: str, attrs: Optional[Dict[str, Any]]
+    ) -> bool:
+        if not attrs:
+            return False
+        if name == "li":
+            return "data-gid" in attrs and "ref" in attrs
+        if name == "div":
+            return "_tag_" in (attrs.get("id") or "")
+        return False
+
 
-# Characters to clean from parsed text (soft hyphen U+00AD and several zero-widths)
-_INVISIBLE_REPLACEMENTS = {
-    "\u00ad": "",  # soft hyphen
-    "\u200b": "",  # zero width space
-    "\ufeff": "",  # byte order mark
-    "\u200e": "",  # left-to-right mark
-    "\u200f": "",  # right-to-left mark
-}
+_MENU_STRAINER = _MenuStrainer()
 
 
 def clean_text(s: Optional[str]) -> Optional[str]:
@@ -53,13 +121,10 @@ def clean_text(s: Optional[str]) -> Optional[str]:
         return None
     if not isinstance(s, str):
         s = str(s)
-    # replace non-breaking space with regular space
-    s = s.replace("\u00a0", " ")
-    # remove common invisible characters
-    for k, v in _INVISIBLE_REPLACEMENTS.items():
-        s = s.replace(k, v)
+    # replace non-breaking space and remove invisible characters in one pass
+    s = s.translate(_TRANS)
     # collapse repeated whitespace
-    s = re.sub(r"\s+", " ", s)
+    s = _WS_RE.sub(" ", s)
     return s.strip()
 
 
@@ -79,15 +144,34 @@ def parse_global_zusatzstoffe(html: str) -> Dict[str, str]:
         (str) or an empty string when no name could be parsed.
     """
     mapping: Dict[str, str] = {}
+    # only scan from the first to the last assignment; str.find locates
+    # both without running the regex over the rest of the page
+    start = html.find('zusatzstoffe["')
+    if start == -1:
+        return mapping
+    end = html.find("</script", html.rfind('zusatzstoffe["'))
+    if end == -1:
+        end = len(html)
     # simplified: find the JSON payloads and load them; site format is stable
-    pattern = (
-        r"zusatzstoffe\[\"([^\"]+)\"\]\s*=\s*JSON\.parse\((?P<j>\"[^\"]*\"|'[^']*')\)"
-    )
-    for m in re.finditer(pattern, html):
+    for m in _ZUSATZ_JS_RE.finditer(html, start, end):
         key = m.group(1)
         js_str = m.group("j")
         if js_str and js_str[0] in ('"', "'"):
             js_str = js_str[1:-1]
+        # only the name is needed: read it with a regex and fall back to a
+        # full json.loads of the payload if that does not find it. The match
+        # only counts when no nested object opens before it, i.e. when it is
+        # the top-level "name" member.
+        name_m = _ZUSATZ_NAME_RE.search(js_str)
+        if name_m and "{" not in js_str[1 : name_m.start()]:
+            name = name_m.group(1)
+            if "\\" in name:
+                try:
+                    name = json.loads(f'"{name}"')
+                except Exception:
+                    name = name.replace("\\/", "/")
+            mapping[key] = name
+            continue
         try:
             obj = json.loads(js_str)
         except Exception:
@@ -115,8 +199,10 @@ def load_html_from_file(path: str) -> str:
 def load_html_from_url(url: str) -> str:
     """Fetch HTML from a remote URL using ``requests``.
 
-    A conservative timeout is used and a descriptive User-Agent header is set
-    to identify this tool. HTTP errors raise an exception.
+    Requests go through a shared session so connections are kept alive
+    between calls. A conservative timeout is used and a descriptive
+    User-Agent header is set to identify this tool. HTTP errors raise an
+    exception.
 
     Args:
         url: The URL to fetch.
@@ -127,16 +213,11 @@ def load_html_from_url(url: str) -> str:
     Raises:
         requests.HTTPError: If the response contains an HTTP error status.
     """
-    resp = requests.get(
-        url,
-        timeout=10,
-        headers={
-            "User-Agent": "MensaFetcher/0.1 (+https://github.com/LeanderJDev) py-requests/"
-            + requests.__version__
-        },
-    )
+    resp = _SESSION.get(url, timeout=10)
     resp.raise_for_status()
-    return resp.text
+    # the site always serves UTF-8; decoding directly skips requests'
+    # charset detection over the whole body
+    return resp.content.decode("utf-8", errors="replace")
 
 
 def find_dish_list(soup: BeautifulSoup) -> List[Tag]:
@@ -152,81 +233,186 @@ def find_dish_list(soup: BeautifulSoup) -> List[Tag]:
     Returns:
         A list of Tag objects for candidate dish list items.
     """
-    return list(soup.select("li[data-gid][ref]"))
+    return list(soup.find_all("li", attrs={"data-gid": True, "ref": True}))
+
+
+# plain text only: leaves out Comment, Doctype, Script, Stylesheet and the
+# other NavigableString subclasses. get_text() would also read CData, but in
+# HTML a CDATA section is a bogus comment that browsers and lxml drop; only
+# html.parser keeps it.
+_TEXT_STRING_TYPES = (NavigableString,)
+
 
+def _walk_node(node: Tag) -> Tuple[Optional[str], List[str], List[str]]:
+    """Collect everything :func:`extract_from_node` needs in a single walk.
 
-def extract_from_node(node: Tag, global_zs: Dict[str, str]) -> Dict[str, Optional[str]]:
+    Args:
+        node: The BeautifulSoup Tag corresponding to a single dish ``<li>``.
+
+    Returns:
+        A tuple ``(heading, tags, strings)`` with the text of the first
+        ``<h3>`` (or None), the raw ``data-type`` values of all images and
+        all text strings below ``node`` in document order. Only plain text
+        is collected: comments, doctypes, CDATA sections and script/style
+        contents are skipped.
+    """
+    heading = None
+    tags: List[str] = []
+    strings: List[str] = []
+    for el in node.descendants:
+        if isinstance(el, Tag):
+            if el.name == "h3" and heading is None:
+                heading = el
+            elif el.name == "img":
+                data_type = el.get("data-type")
+                if data_type:
+                    tags.append(data_type)
+        elif type(el) in _TEXT_STRING_TYPES:
+            strings.append(str(el))
+    if heading is not None:
+        heading = heading.get_text(strip=True, types=_TEXT_STRING_TYPES)
+    return heading, tags, strings
+
+
+def _walk_lxml_node(node: Any) -> Tuple[Optional[str], List[str], List[str]]:
+    """lxml counterpart of :func:`_walk_node`.
+
+    Args:
+        node: The lxml element corresponding to a single dish ``<li>``.
+
+    Returns:
+        The same ``(heading, tags, strings)`` tuple as :func:`_walk_node`.
+    """
+    heading = next(node.iter("h3"), None)
+    if heading is not None:
+        heading = "".join(t.strip() for t in _LXML_TEXT(heading))
+    tags = [dt for img in node.iter("img") if (dt := img.get("data-type"))]
+    return heading, tags, _LXML_TEXT(node)
+
+
+def extract_from_node(
+    node: Tag, global_zs: AbstractSet[str] | Dict[str, str]
+) -> Dict[str, Optional[str]]:
     """Extract structured dish information from a single ``<li>`` node.
 
     The returned dictionary contains the following keys:
     ``name`` (str|None), ``description`` (str|None), ``category`` (str|None),
-    ``zusatzstoffe`` (list[str]), ``tags`` (list[str]) and ``price_eur``
-    (float|None).
+    ``zusatzstoffe`` (list[str]), ``tags`` (list[str]), ``price_eur``
+    (float|None) and the lowercased ``name_norm`` / ``description_norm``
+    (str) used for the canonical dish hash.
 
     Args:
         node: The BeautifulSoup Tag corresponding to a single dish ``<li>``.
-        global_zs: Mapping of valid zusatzstoff codes (from
-            :func:`parse_global_zusatzstoffe`). If provided, only codes present
-            in this mapping are returned.
+        global_zs: Valid zusatzstoff codes, either the mapping from
+            :func:`parse_global_zusatzstoffe` or a frozenset of its keys. If
+            non-empty, only codes present in it are returned.
 
     Returns:
         A dict with parsed fields for the dish.
     """
-    text = clean_text(node.get_text(" ", strip=True))
-    # price
-    price_m = PRICE_RE.search(text)
+    return _build_item(
+        *_walk_node(node),
+        node.get("ref") or node.get("data-ref"),
+        node.get("class") or [],
+        global_zs,
+    )
+
+
+def _extract_from_lxml_node(node: Any, global_zs: AbstractSet[str]) -> Dict[str, Any]:
+    """lxml counterpart of :func:`extract_from_node`."""
+    return _build_item(
+        *_walk_lxml_node(node),
+        node.get("ref") or node.get("data-ref"),
+        (node.get("class") or "").split(),
+        global_zs,
+    )
+
+
+def _build_item(
+    heading: Optional[str],
+    data_types: List[str],
+    strings: List[str],
+    ref_attr: Optional[str],
+    cls: List[str],
+    global_zs: AbstractSet[str] | Dict[str, str],
+) -> Dict[str, Any]:
+    """Build the dish dict from the raw values collected from a ``<li>``.
+
+    Shared by the BeautifulSoup and lxml extraction paths.
+
+    Args:
+        heading: Text of the first ``<h3>`` in the node, or None.
+        data_types: ``data-type`` values of the images in the node.
+        strings: All text strings below the node in document order.
+        ref_attr: The ``ref`` (or ``data-ref``) attribute value, if any.
+        cls: The class tokens of the node.
+        global_zs: Valid zusatzstoff codes (may be empty: no filtering).
+
+    Returns:
+        A dict with parsed fields for the dish (see :func:`extract_from_node`).
+    """
+    text = clean_text(" ".join(p for p in (el.strip() for el in strings) if p))
+    # price (PRICE_RE needs a literal "€"; the substring test is much cheaper
+    # than a regex scan and rules out most texts)
+    price_m = PRICE_RE.search(text) if "€" in text else None
     price = price_m.group(1).replace(",", ".") if price_m else None
     # tags from img[data-type]
-    tags = [
-        clean_text(img.get("data-type"))
-        for img in node.find_all("img")
-        if img.get("data-type")
-    ]
+    tags = [clean_text(dt) for dt in data_types]
     # zusatzstoffe: find patterns like (1,2) or (WEI)
     # zusatzstoffe: prefer parsing the `ref` attribute if present (it contains all codes),
-    zusatz = []
-    ref_attr = node.get("ref") or node.get("data-ref")
+    parts: List[str] = []
     if ref_attr:
-        # unescape HTML entities and extract quoted tokens
-        ref_unesc = clean_text(_html.unescape(ref_attr))
-        parts = re.findall(r'"([^\"]+)"', ref_unesc)
+        # unescape HTML entities (rarely left over after tree building)
+        # and extract quoted tokens
+        if "&" in ref_attr:
+            ref_attr = _html.unescape(ref_attr)
+        ref_unesc = clean_text(ref_attr)
+        parts = _REF_QUOTED_RE.findall(ref_unesc)
         if not parts:
             # fallback: split by non-word characters
-            parts = re.findall(r"[A-Za-z0-9]+", ref_unesc)
-        zusatz = parts
-    # normalize and keep only codes that exist in global mapping when available
-    zusatz = [clean_text(z) for z in zusatz if z and z.strip()]
-    if global_zs:
-        zusatz = [z for z in zusatz if z in global_zs]
-    # remove duplicates while preserving order
-    zusatz = list(dict.fromkeys(zusatz))
+            parts = _WORD_RE.findall(ref_unesc)
+    # normalize, keep only codes that exist in global mapping when available
+    # and remove duplicates while preserving order, all in one pass
+    zusatz: List[str] = []
+    zusatz_set: Set[str] = set()
+    for z in parts:
+        if not z or not z.strip():
+            continue
+        z = clean_text(z)
+        if (global_zs and z not in global_zs) or z in zusatz_set:
+            continue
+        zusatz_set.add(z)
+        zusatz.append(z)
+    zusatz_prefixes = tuple(f"({z}" for z in zusatz)
     # name: prefer headings inside node
     name = None
-    t = node.find("h3")
-    if t and t.get_text(strip=True):
-        name = clean_text(t.get_text(strip=True))
+    if heading:
+        name = clean_text(heading)
     # category: for <li> dish entries the third class token is the category name
     category = None
-    cls = node.get("class") or []
     if isinstance(cls, list) and len(cls) >= 3:
         # third token (index 2)
         category = clean_text(cls[2])
 
     # description: collect non-heading, non-price text parts excluding zusatz tokens
-    desc_parts = []
-    for el in node.find_all(string=True):
+    desc_parts: List[str] = []
+    # every rule below depends only on the text itself, so a repeated text
+    # gets the same verdict and can be skipped straight away
+    seen: Set[str] = set()
+    for el in strings:
         t = clean_text(el)
-        if not t:
+        if not t or t in seen:
             continue
-        if PRICE_RE.search(t):
+        seen.add(t)
+        if "€" in t and PRICE_RE.search(t):
             continue
         # skip pure zusatz tokens
-        if any(t == z or t.startswith(f"({z}") for z in zusatz):
+        if t in zusatz_set or t.startswith(zusatz_prefixes):
             continue
         if name and t == name:
             continue
         desc_parts.append(t)
-    description = " ".join(dict.fromkeys(desc_parts)).strip() or None
+    description = " ".join(desc_parts).strip() or None
 
     return {
         "name": name,
@@ -235,9 +421,33 @@ def extract_from_node(node: Tag, global_zs: Dict[str, str]) -> Dict[str, Optiona
         "zusatzstoffe": zusatz,
         "tags": tags,
         "price_eur": float(price) if price else None,
+        "name_norm": (name or "").strip().lower(),
+        "description_norm": (description or "").strip().lower(),
     }
 
 
+def _choose_day(tag_divs: List[Tuple[int, Any]], date: Optional[str]) -> Any:
+    """Pick the day block to parse from ``(tag_number, element)`` pairs.
+
+    Args:
+        tag_divs: Day blocks found in the document, in document order.
+        date: Optional date token (string like ``YYYYDDD``).
+
+    Returns:
+        The block whose tag number matches ``date``, otherwise the one with
+        the lowest tag number, or None if ``tag_divs`` is empty.
+    """
+    if not tag_divs:
+        return None
+    if date:
+        # try to find the div for the specified date
+        for tag_num, div in tag_divs:
+            if str(tag_num) == date:
+                return div
+        logging.warning(f"specified date {date} not found, using first available tag.")
+    return min(tag_divs, key=lambda x: x[0])[1]
+
+
 def parse_html(html: str, date: Optional[str] = None) -> List[Dict[str, Any]]:
     """Parse a mensa HTML page and extract the list of dishes for a date.
 
@@ -254,42 +464,75 @@ def parse_html(html: str, date: Optional[str] = None) -> List[Dict[str, Any]]:
     Returns:
         A list of dictionaries representing parsed dishes. Each dict uses the
         same structure as returned by :func:`extract_from_node`.
+
+    Results for the last few ``(html, date)`` pairs are memoized, so
+    repeated calls with the same page skip parsing; every call returns its
+    own copy.
     """
-    soup = BeautifulSoup(html, "html.parser")
+    results, global_zs = _parse_html_cached(html, date)
+    # copy only the mutable parts of each dish; the strings are immutable
+    return [
+        [
+            {**d, "zusatzstoffe": list(d["zusatzstoffe"]), "tags": list(d["tags"])}
+            for d in results
+        ],
+        dict(global_zs),
+    ]
+
+
+@functools.lru_cache(maxsize=8)
+def _parse_html_cached(html: str, date: Optional[str]) -> List[Dict[str, Any]]:
+    """Memoized worker for :func:`parse_html`; cached results must not be mutated."""
     global_zs = parse_global_zusatzstoffe(html)
+    # the extractors only test membership; compute the key set once per page
+    gz_keys = frozenset(global_zs)
 
+    if lxml_html is not None:
+        # lxml directly: elements stay in C, no BeautifulSoup object per tag
+        results = []
+        try:
+            try:
+                # the decoded str goes in as is, no re-encoded copy of the page
+                doc = lxml_html.document_fromstring(html)
+            except ValueError:
+                # str input with an XML encoding declaration is refused; the
+                # text is already decoded, so hand it over as UTF-8 bytes
+                doc = lxml_html.document_fromstring(
+                    html.encode("utf-8"), parser=_LXML_PARSER
+                )
+        except etree.ParserError:
+            # "Document is empty": blank, comment-only or prolog-only input
+            return [results, global_zs]
+        # find all divs with ids like '..._tag_<number>'
+        tag_divs = []
+        for div in doc.xpath('//div[contains(@id, "_tag_")]'):
+            m = _TAG_DIV_RE.search(div.get("id"))
+            if m:
+                tag_divs.append((int(m.group(1)), div))
+        chosen = _choose_day(tag_divs, date)
+        root = doc if chosen is None else chosen
+        for n in root.xpath(".//li[@data-gid and @ref]"):
+            results.append(_extract_from_lxml_node(n, gz_keys))
+        return [results, global_zs]
+
+    # only dish and day containers are needed; the zusatzstoffe mapping was
+    # read from the raw HTML above
+    soup = BeautifulSoup(html, "html.parser", parse_only=_MENU_STRAINER)
     # find all divs with ids like '..._tag_<number>'
     tag_divs = []
-    for div in soup.find_all("div", id=True):
-        m = re.search(r"_tag_(\d+)", div["id"])
+    for div in soup.find_all("div", id=_TAG_DIV_RE):
+        m = _TAG_DIV_RE.search(div["id"])
         if m:
             try:
                 tag_divs.append((int(m.group(1)), div))
             except Exception:
                 continue
-    nodes = []
-    if tag_divs:
-        if date:
-            # try to find the div for the specified date
-            date_found = False
-            for tag_num, div in tag_divs:
-                if str(tag_num) == date:
-                    nodes = find_dish_list(div)
-                    date_found = True
-                    break
-            if not date_found:
-                logging.warning(
-                    f"specified date {date} not found, using first available tag."
-                )
-        tag_divs.sort(key=lambda x: x[0])
-        chosen = tag_divs[0][1]
-        nodes = find_dish_list(chosen)
-    else:
-        nodes = find_dish_list(soup)
+    chosen = _choose_day(tag_divs, date)
+    nodes = find_dish_list(soup if chosen is None else chosen)
 
     results = []
     for n in nodes:
-        results.append(extract_from_node(n, global_zs))
+        results.append(extract_from_node(n, gz_keys))
     return [results, global_zs]
 
 
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Check that the lxml and BeautifulSoup paths of parser.py give the same output.
+
+parse_html uses lxml directly when it is installed and BeautifulSoup with
+html.parser otherwise. Both paths must produce identical dish dicts; this
+script parses a page with each of them and compares the results for every
+day block, no date and a date that is not on the page.
+
+Usage examples:
+  python3 -m src.scripts.check_parity
+  python3 -m src.scripts.check_parity --file sample_menu.html
+
+Without ``--file`` a built-in page is used that contains the markup the two
+paths are most likely to disagree on: comments, <script>/<style> contents,
+nested markup inside a dish and day ids that only appear in scripts.
+Exits with status 1 if the outputs differ.
+"""
+
+import argparse
+import json
+import re
+import sys
+
+from .. import parser
+
+_FIXTURE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<script>
+var zusatzstoffe = {};
+zusatzstoffe["1"] = JSON.parse('{"name":"mit Farbstoff","sub":{"name":"x"}}');
+zusatzstoffe["WEI"] = JSON.parse('{"sub":{"name":"inner"},"name":"Weizen"}');
+zusatzstoffe["SEL"] = JSON.parse('{"name":"Sellerie \\\\/ Knolle"}');
+var tpl = '<div id="menu_tag_2026001"><li data-gid="9" ref="[]">fake</li></div>';
+</script>
+<style>.x > div { color: red }</style>
+</head>
+<body>
+<!-- <div id="menu_tag_2026002"> commented-out day -->
+<div id="menu_tag_2026289" data-note="a>b<div">
+  <ul>
+    <li data-gid="1" ref="[&quot;1&quot;,&quot;WEI&quot;]" class="d m Hauptgericht">
+      <h3>Spa<!-- x -->ghetti <span>Bolo&shy;gnese</span><script>h3()</script></h3>
+      <!-- 9,99 € -->
+      <p>mit <b>Parmesan</b>&nbsp;(1,WEI)<style>p{}</style></p>
+      <img data-type="rind" src="r.png"><img src="none.png">
+      <span class="price">3,50&nbsp;€</span>
+      <script>document.write("<div>secret</div>")</script>
+    </li>
+    <li data-gid="2" ref='["SEL"]' class="dish meal Beilage">
+      <h3><ruby>Reis<rp>(</rp><rt>ri</rt><rp>)</rp></ruby></h3>
+      <div><div>Gemüse <i>der</i> Saison</div></div>
+      <template>hidden</template>
+      <img data-type="vegan"><img data-type="vegan">
+      2,10 €
+    </li>
+    <li data-gid="3" class="dish meal Dessert"><h3>no ref, skipped</h3></li>
+  </ul>
+</div>
+<div id="menu_tag_2026290">
+  <li data-gid="4" ref="" class="a b Suppe"><h3>Suppe</h3>Tomate 1,20 €</li>
+</div>
+<div id="menu_tag_2026288"><ul>
+  <li data-gid="5" ref="[]" class="a b"><h3>  </h3><![CDATA[cdata]]> Text</li>
+</ul></div>
+</body>
+</html>
+"""
+
+
+def _parse_both(html: str, date):
+    """Return the ``(lxml, BeautifulSoup)`` results of one uncached parse."""
+    parse = parser._parse_html_cached.__wrapped__
+    lxml_html = parser.lxml_html
+    try:
+        with_lxml = parse(html, date)
+        parser.lxml_html = None
+        with_bs4 = parse(html, date)
+    finally:
+        parser.lxml_html = lxml_html
+    return with_lxml, with_bs4
+
+
+def main() -> None:
+    arg_parser = argparse.ArgumentParser()
+    arg_parser.add_argument(
+        "--file", help="Read HTML from file (default: built-in test page)"
+    )
+    args = arg_parser.parse_args()
+    if parser.lxml_html is None:
+        sys.exit("lxml is not installed; there is only one path to check")
+
+    html = parser.load_html_from_file(args.file) if args.file else _FIXTURE
+    dates = [None, "1"] + sorted(set(re.findall(r"_tag_(\d+)", html)))
+
+    failed = False
+    for date in dates:
+        with_lxml, with_bs4 = _parse_both(html, date)
+        if with_lxml == with_bs4:
+            print(f"date={date}: {len(with_lxml[0])} dishes, same output")
+            continue
+        failed = True
+        print(f"date={date}: outputs differ")
+        print("lxml:", json.dumps(with_lxml, ensure_ascii=False, indent=2))
+        print("bs4: ", json.dumps(with_bs4, ensure_ascii=False, indent=2))
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -16,8 +16,35 @@ import sys
 import tempfile
 import json
 
+try:
+    import orjson
+except ImportError:  # optional, fall back to the stdlib encoder
+    orjson = None
+
 from .. import parser
 
+# characters not allowed in a derived output filename
+_UNSAFE_FILENAME_RE = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def _dump_json(obj) -> bytes:
+    """Serialize ``obj`` as indented UTF-8 JSON.
+
+    Uses ``orjson`` when installed, which encodes straight to bytes and is
+    considerably faster than the stdlib encoder.
+
+    Args:
+        obj: JSON-serializable object (the parsed dish list).
+
+    Returns:
+        The encoded JSON document as bytes.
+    """
+    if orjson is not None:
+        return orjson.dumps(
+            obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        )
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
 
 def main() -> None:
     arg_parser = argparse.ArgumentParser()
@@ -27,6 +54,11 @@ def main() -> None:
     arg_parser.add_argument(
         "--output", "-o", default=None, help="Output JSON file (default: stdout)"
     )
+    arg_parser.add_argument(
+        "--durable",
+        action="store_true",
+        help="fsync the output file before replacing it (slower, survives power loss)",
+    )
     args = arg_parser.parse_args()
     if not args.file and not args.url:
         arg_parser.error("provide --file or --url")
@@ -43,7 +75,7 @@ def main() -> None:
     # default behavior is to write JSON to stdout.
     output_filename = args.output
     if args.date and not output_filename:
-        safe_date = re.sub(r"[^A-Za-z0-9_.-]", "_", date)
+        safe_date = _UNSAFE_FILENAME_RE.sub("_", date)
         output_filename = f"menu_{safe_date}.json"
 
     if args.file:
@@ -58,12 +90,13 @@ def main() -> None:
     if output_filename:
         # --- Atomarer Schreibvorgang ---
         out_dir = os.path.dirname(output_filename) or "."
-        fd, tmp_path = tempfile.mkstemp(prefix="tmp_menu_", dir=out_dir, text=True)
+        fd, tmp_path = tempfile.mkstemp(prefix="tmp_menu_", dir=out_dir)
         try:
-            with os.fdopen(fd, "w", encoding="utf-8") as tf:
-                json.dump(parsed, tf, ensure_ascii=False, indent=2)
-                tf.flush()
-                os.fsync(tf.fileno())
+            with os.fdopen(fd, "wb") as tf:
+                tf.write(_dump_json(parsed))
+                if args.durable:
+                    tf.flush()
+                    os.fsync(tf.fileno())
             # atomar ersetzen
             os.replace(tmp_path, output_filename)
         except Exception:
@@ -78,8 +111,7 @@ def main() -> None:
         print(f"Wrote {len(parsed)} items to {output_filename}")
     else:
         # default: print JSON to stdout
-        json_text = json.dumps(parsed, ensure_ascii=False, indent=2)
-        sys.stdout.write(json_text + "\n")
+        sys.stdout.buffer.write(_dump_json(parsed) + b"\n")
 
 
 if __name__ == "__main__":